@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 import math
 import os
-import json
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby
 from pathlib import Path
 
+import ijson
+import numpy as np
 import requests
 from PIL import Image, ImageDraw
+from shapely.geometry import LineString, box
+from shapely.strtree import STRtree
 
 # ============================================================
 # CONFIG
@@ -44,6 +50,37 @@ OUTPUT_ROOT = Path("tiles")
 
 TILE_SIZE = 256
 
+# Douglas-Peucker tolerance (in pixels) for simplifying lines per zoom;
+# vertices closer together than this are invisible once rasterized
+SIMPLIFY_TOLERANCE_PX = 0.5
+
+# Number of worker processes rendering metatiles in parallel
+NUM_WORKERS = os.cpu_count()
+
+# Tiles are drawn in METATILE x METATILE blocks ("metatiles") that are cut
+# into tiles afterwards, so a feature crossing many tiles is drawn once
+METATILE = 8
+
+# Extra pixels drawn around each metatile, so strokes near its edges are drawn
+# at non-negative coordinates and rasterise the same on both sides of a seam
+METATILE_MARGIN = 16
+
+# PNG encoding + writing happens on background threads in each worker, so
+# the worker can draw the next tile meanwhile. At most WRITE_QUEUE_SIZE
+# tiles wait to be written before the renderer blocks.
+WRITER_THREADS = 4
+WRITE_QUEUE_SIZE = 32
+
+# zlib level for tile PNGs: 1 is much faster than the default (6), for
+# somewhat larger files (~20% on these mostly transparent tiles)
+PNG_COMPRESS_LEVEL = 1
+
+# Zoom levels below this one are built by downsampling the 2x2 child tiles
+# of the zoom above instead of drawing the features again. Downsampled lines
+# come out thinner and fainter than line_width_for_zoom() intends, so this
+# is off (None) by default; e.g. 10 draws z10..MAX_ZOOM and derives z<10.
+DOWNSAMPLE_BELOW_ZOOM = None
+
 # ============================================================
 # RFC COLOURS (exact values you provided)
 # ============================================================
@@ -69,6 +106,9 @@ DEFAULT_COLOR = (200, 200, 200)  # fallback if nothing matches
 # COORDINATE MATH: WGS84 <-> XYZ tiles
 # ============================================================
 
+# Web Mercator y uses ln(tan(lat) + sec(lat)), computed here via the
+# identity ln(tan(lat) + sec(lat)) == asinh(tan(lat)).
+
 def lonlat_to_tile_xy_float(lon, lat, z):
     """
     Return fractional XYZ tile coordinates for a given lon/lat at zoom z.
@@ -76,29 +116,63 @@ def lonlat_to_tile_xy_float(lon, lat, z):
     lat_rad = math.radians(lat)
     n = 2.0 ** z
     xtile = (lon + 180.0) / 360.0 * n
-    ytile = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+    ytile = (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n
     return xtile, ytile
 
 
-def latlon_to_world_px(lat, lon, z):
+def precompute_mercator(lonlat_lines):
     """
-    WGS84 (lat, lon) → world pixel coordinates in Web Mercator for zoom z.
+    Web Mercator coordinates of lon/lat lines (from feature_lines()) in the
+    unit square (0..1 on both axes), as a list of (N, 2) float64 arrays.
+
+    These do not depend on the zoom, so the trig is done once per feature;
+    precompute_world_px() only has to scale them.
     """
-    n = 2.0 ** z
-    lat_rad = math.radians(lat)
-    x = (lon + 180.0) / 360.0 * TILE_SIZE * n
-    y = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * TILE_SIZE * n
-    return x, y
+    return [lonlat_to_mercator_unit(lonlat) for lonlat in lonlat_lines]
 
 
-def latlon_to_tile_px(lat, lon, z, x_tile, y_tile):
+def lonlat_to_mercator_unit(lonlat):
     """
-    WGS84 → pixel inside a specific tile (0–255, 0–255).
+    (N, 2) lon/lat array -> (N, 2) Web Mercator coordinates in the unit square.
     """
-    world_x, world_y = latlon_to_world_px(lat, lon, z)
-    px = world_x - x_tile * TILE_SIZE
-    py = world_y - y_tile * TILE_SIZE
-    return px, py
+    unit = np.empty((len(lonlat), 2), dtype=np.float64)
+
+    lat_rad = np.radians(lonlat[:, 1])
+    unit[:, 0] = (lonlat[:, 0] + 180.0) / 360.0
+    unit[:, 1] = (1.0 - np.arcsinh(np.tan(lat_rad)) / np.pi) / 2.0
+    return unit
+
+
+def precompute_world_px(mercator_lines, z):
+    """
+    World pixel coordinates at zoom z for lines from precompute_mercator().
+    """
+    scale = TILE_SIZE * 2.0 ** z
+    return [unit * scale for unit in mercator_lines]
+
+
+def simplify_lines(world_lines, tolerance):
+    """
+    Douglas-Peucker simplification of world pixel lines (tolerance in pixels).
+    """
+    simplified = []
+    for world in world_lines:
+        line = LineString(world).simplify(tolerance, preserve_topology=False)
+        simplified.append(np.asarray(line.coords, dtype=np.float64))
+    return simplified
+
+
+def world_px_bbox(world_lines):
+    """
+    World pixel bbox (min_x, min_y, max_x, max_y) of projected lines, or None.
+    """
+    if not world_lines:
+        return None
+
+    mins = np.min([world.min(axis=0) for world in world_lines], axis=0)
+    maxs = np.max([world.max(axis=0) for world in world_lines], axis=0)
+
+    return float(mins[0]), float(mins[1]), float(maxs[0]), float(maxs[1])
 
 
 def bbox_to_tile_range(left, bottom, right, top, z):
@@ -125,25 +199,6 @@ def bbox_to_tile_range(left, bottom, right, top, z):
     return x_min, x_max, y_min, y_max
 
 
-def tile_to_bbox(z, x, y):
-    """
-    Tile indices -> lon/lat bbox of the tile (left, bottom, right, top).
-    """
-    n = 2.0 ** z
-
-    lon_left = x / n * 360.0 - 180.0
-    lon_right = (x + 1) / n * 360.0 - 180.0
-
-    def mercator_to_lat(tile_y):
-        lat_rad = math.atan(math.sinh(math.pi - 2.0 * math.pi * tile_y / n))
-        return math.degrees(lat_rad)
-
-    lat_top = mercator_to_lat(y)
-    lat_bottom = mercator_to_lat(y + 1)
-
-    return lon_left, lat_bottom, lon_right, lat_top
-
-
 # ============================================================
 # FEATURE / STYLE HELPERS
 # ============================================================
@@ -163,41 +218,24 @@ def get_corridor_color(feature):
     return DEFAULT_COLOR
 
 
-def feature_bbox(feature):
+def feature_lines(feature):
     """
-    Rough lon/lat bbox for a (multi)linestring to cheaply cull tiles.
+    Lines of a (multi)linestring feature as (N, 2) float64 lon/lat arrays.
+    Lines with fewer than two points (nothing to draw) are dropped.
     """
     geom = feature.get("geometry", {})
     gtype = geom.get("type")
     coords = geom.get("coordinates", [])
 
     if gtype == "LineString":
-        all_coords = coords
+        lines = [coords]
     elif gtype == "MultiLineString":
-        all_coords = [c for line in coords for c in line]
+        lines = coords
     else:
-        return None
-
-    if not all_coords:
-        return None
-
-    lons = [c[0] for c in all_coords]
-    lats = [c[1] for c in all_coords]
-
-    return min(lons), min(lats), max(lons), max(lats)
-
-
-def bbox_intersects(a, b):
-    """
-    Check if two lon/lat bboxes intersect: a=(l,b,r,t), b=(l,b,r,t)
-    """
-    a_left, a_bottom, a_right, a_top = a
-    b_left, b_bottom, b_right, b_top = b
+        # ignore other geometry types
+        return []
 
-    return not (a_right < b_left or
-                a_left > b_right or
-                a_top < b_bottom or
-                a_bottom > b_top)
+    return [np.asarray(line, dtype=np.float64) for line in lines if len(line) >= 2]
 
 
 # ============================================================
@@ -222,54 +260,260 @@ def line_width_for_zoom(z):
         return 1  # close-in / building level
 
 
-def draw_feature_on_tile(draw, feature, z, x_tile, y_tile, color, width):
-    geom = feature.get("geometry", {})
-    gtype = geom.get("type")
-    coords = geom.get("coordinates", [])
+def draw_lines_on_tile(draw, world_lines, origin, fill, width):
+    """
+    Draw world pixel lines of one colour onto the (meta)tile whose top-left
+    world pixel is origin.
+    """
+    # Shift all lines to tile-local pixels in one go and flatten them to a
+    # single [x0, y0, x1, y1, ...] list; doing this per line costs more than
+    # Pillow's actual drawing on busy tiles. Pillow truncates toward zero, so
+    # floor here: points off to the left/top then round the same way whatever
+    # the origin, and a line looks the same in every (meta)tile it crosses.
+    pixels = np.floor(np.concatenate(world_lines) - origin).ravel().tolist()
+
+    # Rounded joints only matter on wide lines (Pillow ignores them at
+    # width <= 4 anyway), so only ask for them there
+    joint = "curve" if width > 4 else None
+
+    start = 0
+    for world in world_lines:
+        end = start + 2 * len(world)
+        draw.line(pixels[start:end], fill=fill, width=width, joint=joint)
+        start = end
+
+
+def render_metatile(img, draw, z, x_start, x_end, y_start, y_end,
+                    feature_fills, world_px_by_feature, world_px_bboxes, tree, width):
+    """
+    Render tiles x_start..x_end, y_start..y_end (at most METATILE on a side)
+    as one image into img (via draw), then cut it into tiles and queue the
+    non-empty ones to be saved as PNG. Returns the Futures of the writes.
+    """
+    meta_left, meta_top = x_start * TILE_SIZE, y_start * TILE_SIZE
+    meta_right, meta_bottom = (x_end + 1) * TILE_SIZE, (y_end + 1) * TILE_SIZE
+
+    # Features whose world pixel bbox intersects this metatile, in input order.
+    # The area is padded by half the line width so strokes of lines running
+    # just outside it are still drawn.
+    pad = width / 2.0
+    meta_px_box = box(meta_left - pad, meta_top - pad, meta_right + pad, meta_bottom + pad)
+    candidates = np.sort(tree.query(meta_px_box))
+
+    # Nothing can land on these tiles: skip clearing, drawing and saving
+    if len(candidates) == 0:
+        return []
+
+    # Reset the part of the reused image this metatile (plus margin) covers
+    img.paste((0, 0, 0, 0), (0, 0, meta_right - meta_left + 2 * METATILE_MARGIN,
+                             meta_bottom - meta_top + 2 * METATILE_MARGIN))
+
+    # Draw in input order, so the same corridor ends up on top of a shared
+    # track as in per-feature drawing; consecutive candidates with the same
+    # colour are batched into one call
+    origin = np.array([meta_left - METATILE_MARGIN, meta_top - METATILE_MARGIN],
+                      dtype=np.float64)
+    for fill, run in groupby(candidates, key=feature_fills.__getitem__):
+        world_lines = [world for i in run for world in world_px_by_feature[i]]
+        draw_lines_on_tile(draw, world_lines, origin, fill, width)
+
+    # Which tiles any candidate bbox touches, for all tiles at once: overlap
+    # per column (K, cols) and per row (K, rows), combined over candidates
+    bboxes = world_px_bboxes[candidates]
+    tile_lefts = np.arange(x_start, x_end + 1) * TILE_SIZE
+    tile_tops = np.arange(y_start, y_end + 1) * TILE_SIZE
+    x_hits = ((bboxes[:, 2:3] >= tile_lefts - pad) &
+              (bboxes[:, 0:1] <= tile_lefts + TILE_SIZE + pad))
+    y_hits = ((bboxes[:, 3:4] >= tile_tops - pad) &
+              (bboxes[:, 1:2] <= tile_tops + TILE_SIZE + pad))
+    tile_hits = x_hits.T.astype(np.int32) @ y_hits.astype(np.int32)
+
+    writes = []
+    for x in range(x_start, x_end + 1):
+        for y in range(y_start, y_end + 1):
+            # No feature near this tile: it is empty, skip crop and scan
+            if not tile_hits[x - x_start, y - y_start]:
+                continue
+
+            left = (x - x_start) * TILE_SIZE + METATILE_MARGIN
+            top = (y - y_start) * TILE_SIZE + METATILE_MARGIN
+            tile = img.crop((left, top, left + TILE_SIZE, top + TILE_SIZE))
+
+            # Skip tiles that are empty (fully transparent)
+            if tile.getbbox() is None:
+                continue
+
+            writes.append(submit_png(tile.tobytes(), tile_path(z, x, y)))
+
+    return writes
+
+
+def downsample_tile(z, x, y):
+    """
+    Build tile (z, x, y) by shrinking its four children at zoom z + 1 and queue
+    it to be saved as PNG. Returns the Future of the write, or None if the
+    tile would be empty.
+    """
+    canvas = None
+    for dx in (0, 1):
+        for dy in (0, 1):
+            child_path = OUTPUT_ROOT / str(z + 1) / str(2 * x + dx) / f"{2 * y + dy}.png"
+            if not child_path.exists():
+                continue
+            if canvas is None:
+                canvas = Image.new("RGBA", (2 * TILE_SIZE, 2 * TILE_SIZE), (0, 0, 0, 0))
+            with Image.open(child_path) as child:
+                canvas.paste(child, (dx * TILE_SIZE, dy * TILE_SIZE))
+
+    if canvas is None:
+        return None
 
-    def draw_linestring(line_coords):
-        pixels = []
-        for lon, lat in line_coords:
-            px, py = latlon_to_tile_px(lat, lon, z, x_tile, y_tile)
-            pixels.append((px, py))
+    img = canvas.resize((TILE_SIZE, TILE_SIZE), Image.LANCZOS)
+    if img.getbbox() is None:
+        return None
 
-        if len(pixels) >= 2:
-            # RGBA color: add alpha = 255
-            draw.line(pixels, fill=color + (255,), width=width, joint="curve")
+    return submit_png(img.tobytes(), tile_path(z, x, y))
 
-    if gtype == "LineString":
-        draw_linestring(coords)
-    elif gtype == "MultiLineString":
-        for line in coords:
-            draw_linestring(line)
-    else:
-        # ignore other geometry types
-        return
+
+def tile_path(z, x, y):
+    """
+    Output path of tile (z, x, y); creates its directory on first use.
+    """
+    out_dir = OUTPUT_ROOT / str(z) / str(x)
+    if out_dir not in _made_dirs:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        _made_dirs.add(out_dir)
+    return out_dir / f"{y}.png"
+
+
+def _save_png(data, out_path):
+    img = Image.frombytes("RGBA", (TILE_SIZE, TILE_SIZE), data)
+    img.save(out_path, format="PNG", optimize=False, compress_level=PNG_COMPRESS_LEVEL)
+    # print(f"Saved {out_path}")
+
+
+def submit_png(data, out_path):
+    """
+    Queue raw RGBA tile pixels to be written as PNG on a writer thread.
+    Blocks while WRITE_QUEUE_SIZE writes are already pending.
+
+    Tiles are not deduplicated: empty tiles are never written, and identical
+    non-empty tiles are so rare that hashing every tile to hardlink them
+    would cost more than the PNG encodes it saves.
+    """
+    _write_slots.acquire()
+    future = _writer_pool.submit(_save_png, data, out_path)
+    future.add_done_callback(lambda _: _write_slots.release())
+    return future
+
+
+# ============================================================
+# WORKER PROCESSES
+# ============================================================
+
+# Per-process state, set once by _init_worker so that the feature fills
+# and the zoom's projected coordinates are pickled once per worker instead
+# of once per task.
+_feature_fills = None
+_world_px_by_feature = None
+_world_px_bboxes = None
+_tree = None
+
+# Metatile image and drawing context reused for every metatile a worker renders
+_meta_img = None
+_meta_draw = None
+
+# Background PNG writers of this worker and the slots bounding their queue
+_writer_pool = None
+_write_slots = None
+
+# Output directories this process already created (one mkdir per column)
+_made_dirs = set()
+
+
+def _init_worker(feature_fills, world_px_by_feature, world_px_bboxes, tree):
+    global _feature_fills, _world_px_by_feature, _world_px_bboxes, _tree
+    global _meta_img, _meta_draw
+    _feature_fills = feature_fills
+    _world_px_by_feature = world_px_by_feature
+    _world_px_bboxes = world_px_bboxes
+    _tree = tree
+
+    meta_size = METATILE * TILE_SIZE + 2 * METATILE_MARGIN
+    _meta_img = Image.new("RGBA", (meta_size, meta_size), (0, 0, 0, 0))
+    _meta_draw = ImageDraw.Draw(_meta_img, "RGBA")
+
+    _init_writer()
+
+
+def _init_writer():
+    global _writer_pool, _write_slots
+    _writer_pool = ThreadPoolExecutor(max_workers=WRITER_THREADS)
+    _write_slots = threading.BoundedSemaphore(WRITE_QUEUE_SIZE)
+
+
+def render_metatile_task(task):
+    """
+    Render one metatile (z, x_start, x_end, y_start, y_end). Returns the number
+    of tiles written.
+    """
+    z, x_start, x_end, y_start, y_end = task
+    width = line_width_for_zoom(z)
+
+    writes = render_metatile(_meta_img, _meta_draw, z, x_start, x_end, y_start, y_end,
+                             _feature_fills, _world_px_by_feature, _world_px_bboxes,
+                             _tree, width)
+
+    # Wait for this metatile's writes so errors surface in the parent
+    for write in writes:
+        write.result()
+    return len(writes)
+
+
+def downsample_tile_column(task):
+    """
+    Downsample all tiles of one (z, x) column from zoom z + 1. Returns the
+    number of tiles written.
+    """
+    z, x, y_min, y_max = task
+
+    writes = []
+    for y in range(y_min, y_max + 1):
+        write = downsample_tile(z, x, y)
+        if write is not None:
+            writes.append(write)
+
+    for write in writes:
+        write.result()
+    return len(writes)
 
 
 # ============================================================
 # LOAD GEOJSON
 # ============================================================
 
-def load_geojson():
+def load_features():
     """
-    Load FeatureCollection from local file if present, otherwise from CIP URL.
+    Stream the features of the FeatureCollection one at a time, from the
+    local file if present, otherwise fetched from the CIP URL first.
     """
     if Path(GEOJSON_FILE).exists():
         print(f"Loading GeoJSON from {GEOJSON_FILE}")
-        with open(GEOJSON_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    print(f"Fetching GeoJSON from CIP: {CIP_GEOJSON_URL}")
-    resp = requests.get(CIP_GEOJSON_URL)
-    resp.raise_for_status()
-    data = resp.json()
+    else:
+        print(f"Fetching GeoJSON from CIP: {CIP_GEOJSON_URL}")
+        resp = requests.get(CIP_GEOJSON_URL, stream=True)
+        resp.raise_for_status()
 
-    # Save for later runs
-    with open(GEOJSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f)
+        # Save for later runs; write to a temp file so an interrupted
+        # download never leaves a truncated cache behind
+        part_file = GEOJSON_FILE + ".part"
+        with open(part_file, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+        os.replace(part_file, GEOJSON_FILE)
 
-    return data
+    with open(GEOJSON_FILE, "rb") as f:
+        yield from ijson.items(f, "features.item", use_float=True)
 
 
 # ============================================================
@@ -277,17 +521,29 @@ def load_geojson():
 # ============================================================
 
 def main():
-    data = load_geojson()
-    features = data.get("features", [])
-    print(f"Loaded {len(features)} features")
-
-    # Precompute feature bboxes to speed up culling
+    # Keep only compact per-feature data (lon/lat arrays, fill colour);
+    # each parsed feature dict is dropped right away
     feature_infos = []
-    for f in features:
-        fbbox = feature_bbox(f)
-        feature_infos.append((f, fbbox))
+    for f in load_features():
+        lines = feature_lines(f)
+        # RGBA color: add alpha = 255
+        fill = get_corridor_color(f) + (255,)
+        feature_infos.append((lines, fill))
+    print(f"Loaded {len(feature_infos)} features")
+
+    # Workers only need the fill per feature, not the feature itself
+    feature_fills = [fill for _, fill in feature_infos]
+
+    # The Mercator trig is zoom-independent: do it once, then scale per zoom
+    mercator_by_feature = [precompute_mercator(lines) for lines, _ in feature_infos]
+
+    # Zooms that are drawn; any below them are downsampled afterwards
+    if DOWNSAMPLE_BELOW_ZOOM is None:
+        draw_min_zoom = MIN_ZOOM
+    else:
+        draw_min_zoom = max(MIN_ZOOM, min(DOWNSAMPLE_BELOW_ZOOM, MAX_ZOOM))
 
-    for z in range(MIN_ZOOM, MAX_ZOOM + 1):
+    for z in range(draw_min_zoom, MAX_ZOOM + 1):
         print(f"\n=== Generating zoom {z} ===")
 
         x_min, x_max, y_min, y_max = bbox_to_tile_range(
@@ -295,34 +551,54 @@ def main():
         )
         print(f"Tile range z={z}: x={x_min}..{x_max}, y={y_min}..{y_max}")
 
-        for x in range(x_min, x_max + 1):
-            for y in range(y_min, y_max + 1):
-                tile_bbox = tile_to_bbox(z, x, y)
-
-                # Create transparent image
-                img = Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
-                draw = ImageDraw.Draw(img, "RGBA")
-                width = line_width_for_zoom(z)
-
-                # Draw any feature that intersects this tile
-                for f, fbbox in feature_infos:
-                    if fbbox is None:
-                        continue
-                    if not bbox_intersects(tile_bbox, fbbox):
-                        continue
-
-                    color = get_corridor_color(f)
-                    draw_feature_on_tile(draw, f, z, x, y, color, width)
-
-                # Skip tiles that are empty (fully transparent)
-                if img.getbbox() is None:
-                    continue
-
-                out_dir = OUTPUT_ROOT / str(z) / str(x)
-                out_dir.mkdir(parents=True, exist_ok=True)
-                out_path = out_dir / f"{y}.png"
-                img.save(out_path, format="PNG")
-                # print(f"Saved {out_path}")
+        # Project and simplify every feature once per zoom; tiles only
+        # subtract their origin
+        world_px_by_feature = [
+            simplify_lines(precompute_world_px(m, z), SIMPLIFY_TOLERANCE_PX)
+            for m in mercator_by_feature
+        ]
+
+        # World pixel bboxes as an (F, 4) array (NaN rows for features without
+        # lines), and an R-tree over them, so culling needs no trig; query
+        # results index into feature_infos (empty features are never returned)
+        bboxes = [world_px_bbox(lines) for lines in world_px_by_feature]
+        world_px_bboxes = np.array(
+            [bbox if bbox else (np.nan,) * 4 for bbox in bboxes], dtype=np.float64
+        ).reshape(-1, 4)
+        tree = STRtree([box(*bbox) if bbox else None for bbox in bboxes])
+
+        # One task per metatile, aligned to multiples of METATILE and clipped
+        # to the tile range; metatiles share no state
+        tasks = [
+            (z, max(mx, x_min), min(mx + METATILE - 1, x_max),
+             max(my, y_min), min(my + METATILE - 1, y_max))
+            for mx in range(x_min - x_min % METATILE, x_max + 1, METATILE)
+            for my in range(y_min - y_min % METATILE, y_max + 1, METATILE)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=NUM_WORKERS,
+            initializer=_init_worker,
+            initargs=(feature_fills, world_px_by_feature, world_px_bboxes, tree),
+        ) as executor:
+            written = sum(executor.map(render_metatile_task, tasks, chunksize=4))
+        print(f"Wrote {written} tiles for z={z}")
+
+    # Each downsampled zoom needs the one above it, so go top-down
+    for z in range(draw_min_zoom - 1, MIN_ZOOM - 1, -1):
+        print(f"\n=== Downsampling zoom {z} from zoom {z + 1} ===")
+
+        x_min, x_max, y_min, y_max = bbox_to_tile_range(
+            BBOX_LEFT, BBOX_BOTTOM, BBOX_RIGHT, BBOX_TOP, z
+        )
+        print(f"Tile range z={z}: x={x_min}..{x_max}, y={y_min}..{y_max}")
+
+        tasks = [(z, x, y_min, y_max) for x in range(x_min, x_max + 1)]
+        with ProcessPoolExecutor(
+            max_workers=NUM_WORKERS,
+            initializer=_init_writer,
+        ) as executor:
+            written = sum(executor.map(downsample_tile_column, tasks, chunksize=4))
+        print(f"Wrote {written} tiles for z={z}")
 
     print("\nDone. Tiles are in:", OUTPUT_ROOT.resolve())
 